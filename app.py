@@ -4,20 +4,26 @@ Dynamic llms.txt generator with beautiful UI
 """
 
 import asyncio
+import io
 from fastapi import FastAPI, Request, Form, HTTPException
 from fastapi.responses import HTMLResponse, PlainTextResponse, JSONResponse
-from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 import httpx
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 from urllib.parse import urljoin, urlparse
-import xml.etree.ElementTree as ET
-import re
+from lxml import etree
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
 from datetime import datetime
 from dataclasses import dataclass, field
-from typing import Optional
+from functools import lru_cache
+from typing import Iterator, Optional
+import multiprocessing
 import os
+from http.cookiejar import CookieJar, DefaultCookiePolicy
 
 app = FastAPI(title="FreeLLMsTxt", description="Dynamic llms.txt Generator")
 
@@ -54,6 +60,143 @@ class PageInfo:
     description: str = ""
     content_preview: str = ""
     links: list[str] = field(default_factory=list)
+    path_parts: list[str] = field(default_factory=list)
+
+
+# Fragment-only, javascript, mailto and tel links are never crawlable
+_SKIP_HREF_PREFIXES = ('#', 'javascript:', 'mailto:', 'tel:')
+
+# Elements whose text can serve as the content preview
+_PREVIEW_TAGS = frozenset({'p', 'article', 'main'})
+
+
+def _no_cookie_jar() -> CookieJar:
+    """Cookie jar that rejects every cookie"""
+    return CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+
+
+def _create_http_client(timeout: float = 10.0) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=True,
+        cookies=_no_cookie_jar(),
+        timeout=timeout,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_keepalive_connections=32,
+            max_connections=64,
+            keepalive_expiry=30.0
+        ),
+        trust_env=False,
+        headers={'User-Agent': 'FreeLLMsTxt-Bot/1.0'}
+    )
+
+
+@lru_cache(maxsize=4096)
+def _clean_netloc(url: str) -> str:
+    """Netloc without the www. prefix"""
+    return urlparse(url).netloc.lower().replace('www.', '')
+
+
+def _canonical_url(url: str) -> str:
+    """Lowercase scheme and host and resolve dot segments, so variants of one page dedupe together"""
+    start = url.find('://') + 3
+    end = len(url)
+    for ch in '/?#':
+        pos = url.find(ch, start)
+        if pos != -1 and pos < end:
+            end = pos
+    head, rest = url[:end].lower(), url[end:]
+    if '/.' in rest and rest.startswith('/'):
+        # urljoin only removes dot segments when resolving a path against a base
+        return urljoin(head, rest)
+    return head + rest
+
+
+def _extract_links(tree: LexborHTMLParser, base_url: str, base_netloc_clean: str) -> list[str]:
+    links = []
+    seen = set()
+    parsed_base = urlparse(base_url)
+    origin = f"{parsed_base.scheme}://{parsed_base.netloc.lower()}"
+    
+    for anchor in tree.css('a[href]'):
+        href = anchor.attrs.get('href')
+        if not href or href[0] == '#' or href.startswith(_SKIP_HREF_PREFIXES):
+            continue
+        
+        # Fast paths for root-relative and absolute hrefs; urljoin for the rest
+        if href.startswith('/') and not href.startswith('//') and '/.' not in href:
+            full_url = origin + href
+        elif href.startswith(('http://', 'https://')):
+            full_url = _canonical_url(href)
+        else:
+            full_url = _canonical_url(urljoin(base_url, href))
+        full_url = full_url.partition('#')[0]
+        
+        # Same-domain only, treating www and non-www as the same site
+        if full_url not in seen and _clean_netloc(full_url) == base_netloc_clean:
+            seen.add(full_url)
+            links.append(full_url)
+    
+    return links
+
+
+def _extract_page_info_static(url: str, html: bytes, base_netloc_clean: str,
+                              charset: Optional[str] = None) -> PageInfo:
+    """Extract page info and links from a single parse (module-level so worker processes can run it)"""
+    tree = None
+    if charset:
+        # A charset in the Content-Type header wins over anything in the document;
+        # Lexbor only sniffs BOMs and <meta>, so decode it ourselves
+        try:
+            tree = LexborHTMLParser(html.decode(charset, 'replace'))
+        except LookupError:
+            pass
+    if tree is None:
+        tree = LexborHTMLParser(html, encoding=True)
+    # Title and meta tags live in <head>; search only there instead of the whole document,
+    # falling back to the full tree for pages that put them elsewhere
+    head = tree.head
+
+    def head_first(selector: str):
+        return (head and head.css_first(selector)) or tree.css_first(selector)
+
+    title = ""
+    title_tag = head_first('title')
+    if title_tag:
+        title = title_tag.text(strip=True)
+    
+    description = ""
+    meta_desc = head_first('meta[name="description"]')
+    if meta_desc and meta_desc.attrs.get('content'):
+        description = meta_desc.attrs['content']
+    
+    if not description:
+        og_desc = head_first('meta[property="og:description"]')
+        if og_desc and og_desc.attrs.get('content'):
+            description = og_desc.attrs['content']
+    
+    # Walk the body in document order and stop at the first match rather than
+    # collecting every <p> on the page up front
+    content_preview = ""
+    body = tree.body
+    for tag in body.traverse() if body else ():
+        if tag.tag not in _PREVIEW_TAGS:
+            continue
+        text = tag.text(strip=True)
+        if len(text) > 100:
+            content_preview = text[:500] + "..." if len(text) > 500 else text
+            break
+    
+    links = _extract_links(tree, url, base_netloc_clean)
+    
+    return PageInfo(
+        url=url,
+        title=title,
+        description=description,
+        content_preview=content_preview,
+        links=links,
+        path_parts=[p for p in urlparse(url).path.split('/') if p]
+    )
 
 
 class AsyncWebCrawler:
@@ -71,11 +214,30 @@ class AsyncWebCrawler:
         '/page-sitemap.xml',
     ]
     
-    def __init__(self, base_url: str, max_urls: int = 20, timeout: float = 10.0):
+    # Download caps so a rogue response can't stall the crawl or exhaust memory
+    MAX_PAGE_BYTES = 4_000_000
+    MAX_SITEMAP_BYTES = 32_000_000
+    
+    # Concurrent requests allowed per host other than the one being crawled
+    HOST_CONCURRENCY = 8
+    
+    # Lexbor parses a typical page in about a millisecond, less than pickling it to a
+    # worker costs; only pages big enough to stall the event loop go to the pool
+    POOL_PARSE_MIN_BYTES = 256_000
+    
+    def __init__(self, base_url: str, max_urls: int = 20, timeout: float = 10.0,
+                 client: Optional[httpx.AsyncClient] = None, executor: Optional[Executor] = None):
         self.base_url = self._normalize_url(base_url)
+        self._base_netloc_clean = urlparse(self.base_url).netloc.replace('www.', '')
         self.max_urls = max_urls
         self.timeout = timeout
+        self.client = client
+        self.executor = executor
+        self.concurrency = 16
+        self._host_sems: dict[str, asyncio.Semaphore] = {}
         self.logs: list[str] = []
+        # Pages already fetched and parsed during homepage discovery
+        self.crawled_pages: dict[str, PageInfo] = {}
         
     def _normalize_url(self, url: str) -> str:
         if not url.startswith(('http://', 'https://')):
@@ -85,49 +247,117 @@ class AsyncWebCrawler:
     def _log(self, message: str):
         self.logs.append(message)
     
-    def _is_same_domain(self, url: str) -> bool:
-        base_domain = urlparse(self.base_url).netloc
-        url_domain = urlparse(url).netloc
-        # Handle www vs non-www
-        base_clean = base_domain.replace('www.', '')
-        url_clean = url_domain.replace('www.', '')
-        return base_clean == url_clean
+    def _sem_for(self, url: str) -> asyncio.Semaphore:
+        """Per-host limiter: generous for the crawled site, tighter for other hosts (e.g. a sitemap CDN)"""
+        netloc = urlparse(url).netloc
+        sem = self._host_sems.get(netloc)
+        if sem is None:
+            limit = self.concurrency if _clean_netloc(url) == self._base_netloc_clean else self.HOST_CONCURRENCY
+            sem = self._host_sems[netloc] = asyncio.Semaphore(limit)
+        return sem
+    
+    @asynccontextmanager
+    async def _client_scope(self):
+        """Use the shared client when one was given, otherwise a private one for this crawl"""
+        if self.client is not None:
+            yield self.client
+        else:
+            async with _create_http_client(self.timeout) as client:
+                yield client
     
-    async def _fetch(self, client: httpx.AsyncClient, url: str) -> Optional[str]:
+    async def _fetch(self, client: httpx.AsyncClient, url: str, max_bytes: int = MAX_PAGE_BYTES) -> Optional[bytes]:
+        # Raw bytes: the parsers detect encoding themselves, skipping httpx's decode
+        body, _ = await self._fetch_page(client, url, max_bytes)
+        return body
+    
+    async def _fetch_page(self, client: httpx.AsyncClient, url: str,
+                          max_bytes: int = MAX_PAGE_BYTES) -> tuple[Optional[bytes], Optional[str]]:
+        """Fetch raw bytes plus the charset declared in the Content-Type header, if any"""
         try:
-            response = await client.get(url)
-            response.raise_for_status()
-            return response.text
+            async with self._sem_for(url), client.stream('GET', url, timeout=self.timeout) as response:
+                response.raise_for_status()
+                buf = bytearray()
+                async for chunk in response.aiter_bytes():
+                    buf.extend(chunk)
+                    if len(buf) >= max_bytes:
+                        del buf[max_bytes:]
+                        break
+                return bytes(buf), response.charset_encoding
         except httpx.HTTPError as e:
             self._log(f"⚠️ Failed: {url}")
-            return None
+            return None, None
+    
+    def _parse_sitemap(self, parser: etree.XMLPullParser, already_seen: dict[str, None]) -> Iterator[tuple[str, str]]:
+        """Yield ('url' | 'sitemap', loc) for each finished <loc>, skipping page URLs already seen"""
+        for _, elem in parser.read_events():
+            tag = elem.tag.rpartition('}')[2]
+            
+            if tag == 'loc':
+                parent_elem = elem.getparent()
+                if parent_elem is None:
+                    # A bare <loc> root isn't a sitemap entry
+                    continue
+                parent = parent_elem.tag.rpartition('}')[2]
+                loc = elem.text.strip() if elem.text else ''
+                if loc and parent == 'sitemap':
+                    yield 'sitemap', loc
+                elif loc and parent == 'url' and loc not in already_seen:
+                    yield 'url', loc
+            elif tag in ('url', 'sitemap'):
+                # Drop finished entries so memory stays flat on huge sitemaps
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
     
-    def _parse_sitemap(self, xml_content: str) -> tuple[list[str], list[str]]:
-        urls = []
+    async def _fetch_sitemap(self, client: httpx.AsyncClient, url: str, found: dict[str, None]) -> list[str]:
+        """
+        Stream a sitemap into an incremental parser, adding new page URLs to found.
+        Stops downloading once max_urls is reached. Returns nested sitemap URLs.
+        """
         nested_sitemaps = []
+        parser = etree.XMLPullParser(events=('end',), resolve_entities=False)
+        
+        def collect() -> bool:
+            for kind, loc in self._parse_sitemap(parser, found):
+                if kind == 'sitemap':
+                    nested_sitemaps.append(loc)
+                else:
+                    found[loc] = None
+                    if len(found) >= self.max_urls:
+                        return True
+            return False
         
         try:
-            xml_content = re.sub(r'xmlns[^"]*"[^"]*"', '', xml_content)
-            root = ET.fromstring(xml_content)
-            
-            for sitemap in root.findall('.//sitemap'):
-                loc = sitemap.find('loc')
-                if loc is not None and loc.text:
-                    nested_sitemaps.append(loc.text.strip())
-            
-            for url in root.findall('.//url'):
-                loc = url.find('loc')
-                if loc is not None and loc.text:
-                    urls.append(loc.text.strip())
-                    
-        except ET.ParseError:
+            async with self._sem_for(url), client.stream('GET', url, timeout=self.timeout) as response:
+                response.raise_for_status()
+                received = 0
+                async for chunk in response.aiter_bytes():
+                    # Sibling sitemaps share found, so this also stops once they fill it
+                    if len(found) >= self.max_urls:
+                        return nested_sitemaps
+                    received += len(chunk)
+                    if received > self.MAX_SITEMAP_BYTES:
+                        self._log(f"⚠️ Sitemap too large, truncated: {url}")
+                        break
+                    parser.feed(chunk)
+                    if collect():
+                        return nested_sitemaps
+            parser.close()
+            collect()
+        except httpx.HTTPError:
+            self._log(f"⚠️ Failed: {url}")
+        except etree.XMLSyntaxError:
             pass
         
-        return urls, nested_sitemaps
+        return nested_sitemaps
     
-    def _find_sitemaps_in_robots(self, robots_content: str) -> list[str]:
+    @staticmethod
+    def _is_sitemap(content) -> bool:
+        return isinstance(content, bytes) and (b'<urlset' in content or b'<sitemapindex' in content)
+    
+    def _find_sitemaps_in_robots(self, robots_content: bytes) -> list[str]:
         sitemaps = []
-        for line in robots_content.splitlines():
+        for line in robots_content.decode('utf-8', 'replace').splitlines():
             line = line.strip()
             if line.lower().startswith('sitemap:'):
                 sitemap_url = line.split(':', 1)[1].strip()
@@ -135,89 +365,64 @@ class AsyncWebCrawler:
                     sitemaps.append(sitemap_url)
         return sitemaps
     
-    def _extract_links_from_html(self, html: str, base_url: str) -> list[str]:
-        soup = BeautifulSoup(html, 'lxml')
-        links = []
-        
-        for anchor in soup.find_all('a', href=True):
-            href = anchor['href']
-            if href.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
-                continue
-            
-            full_url = urljoin(base_url, href)
-            full_url = full_url.split('#')[0]
-            
-            if self._is_same_domain(full_url) and full_url not in links:
-                links.append(full_url)
-        
-        return links
+    def _extract_page_info(self, url: str, html: bytes, charset: Optional[str] = None) -> PageInfo:
+        return _extract_page_info_static(url, html, self._base_netloc_clean, charset)
     
-    def _extract_page_info(self, url: str, html: str) -> PageInfo:
-        soup = BeautifulSoup(html, 'lxml')
-        
-        title = ""
-        title_tag = soup.find('title')
-        if title_tag:
-            title = title_tag.get_text(strip=True)
-        
-        description = ""
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        if meta_desc and meta_desc.get('content'):
-            description = meta_desc['content']
-        
-        if not description:
-            og_desc = soup.find('meta', attrs={'property': 'og:description'})
-            if og_desc and og_desc.get('content'):
-                description = og_desc['content']
-        
-        content_preview = ""
-        for tag in soup.find_all(['p', 'article', 'main']):
-            text = tag.get_text(strip=True)
-            if len(text) > 100:
-                content_preview = text[:500] + "..." if len(text) > 500 else text
-                break
-        
-        links = self._extract_links_from_html(html, url)
-        
-        return PageInfo(
-            url=url,
-            title=title,
-            description=description,
-            content_preview=content_preview,
-            links=links
-        )
-    
-    async def _crawl_sitemaps(self, client: httpx.AsyncClient, sitemap_urls: list[str], depth: int = 0) -> list[str]:
-        if depth > 3:
-            return []
-        
-        all_urls = []
+    async def _parse_page(self, url: str, html: bytes, charset: Optional[str] = None) -> PageInfo:
+        """Parse large pages in the worker pool when one is configured, keeping the event loop free"""
+        if self.executor is None or len(html) < self.POOL_PARSE_MIN_BYTES:
+            return self._extract_page_info(url, html, charset)
+        executor = self.executor
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                executor, _extract_page_info_static, url, html, self._base_netloc_clean, charset
+            )
+        except BrokenProcessPool:
+            # A worker died (OOM kill, native crash); finish this crawl inline and
+            # have the app swap in a fresh pool for later requests
+            self._log("⚠️ Parser pool crashed, parsing inline")
+            _replace_parse_pool(executor)
+            self.executor = None
+            return self._extract_page_info(url, html, charset)
+    
+    async def _crawl_sitemaps(self, client: httpx.AsyncClient, sitemap_urls: list[str], depth: int = 0,
+                              found: Optional[dict[str, None]] = None) -> list[str]:
+        """Crawl sitemaps breadth-first, stopping once max_urls unique URLs are found"""
+        found = {} if found is None else found
+        nested = []
         
-        for sitemap_url in sitemap_urls:
-            self._log(f"📄 Parsing sitemap: {sitemap_url}")
-            content = await self._fetch(client, sitemap_url)
+        # Fetch each level in batches so no further sitemaps are requested once we have enough
+        for start in range(0, len(sitemap_urls), self.concurrency):
+            batch = sitemap_urls[start:start + self.concurrency]
+            for sitemap_url in batch:
+                self._log(f"📄 Parsing sitemap: {sitemap_url}")
+            results = await asyncio.gather(*[self._fetch_sitemap(client, u, found) for u in batch])
             
-            if not content:
-                continue
-                
-            urls, nested_sitemaps = self._parse_sitemap(content)
-            all_urls.extend(urls)
+            for nested_sitemaps in results:
+                if nested_sitemaps:
+                    self._log(f"📁 Found {len(nested_sitemaps)} nested sitemap(s)")
+                    nested.extend(nested_sitemaps)
             
-            if nested_sitemaps:
-                self._log(f"📁 Found {len(nested_sitemaps)} nested sitemap(s)")
-                all_urls.extend(await self._crawl_sitemaps(client, nested_sitemaps, depth + 1))
+            if len(found) >= self.max_urls:
+                return list(found)[:self.max_urls]
+        
+        # Prevent infinite recursion
+        if nested and depth < 3:
+            await self._crawl_sitemaps(client, list(dict.fromkeys(nested)), depth + 1, found)
         
-        return all_urls
+        return list(found)[:self.max_urls]
     
     async def _crawl_from_homepage(self, client: httpx.AsyncClient) -> list[str]:
         self._log("🔍 No sitemap found. Crawling from homepage...")
         
-        urls_to_visit = [self.base_url]
+        urls_to_visit = deque([self.base_url])
+        queued = {self.base_url}
         visited = set()
         discovered = []
         
         while urls_to_visit and len(discovered) < self.max_urls:
-            current_url = urls_to_visit.pop(0)
+            current_url = urls_to_visit.popleft()
             
             if current_url in visited:
                 continue
@@ -225,15 +430,17 @@ class AsyncWebCrawler:
             visited.add(current_url)
             self._log(f"🌐 Crawling: {current_url}")
             
-            html = await self._fetch(client, current_url)
+            html, charset = await self._fetch_page(client, current_url)
             if not html:
                 continue
             
             discovered.append(current_url)
             
-            links = self._extract_links_from_html(html, current_url)
-            for link in links:
-                if link not in visited and link not in urls_to_visit:
+            page_info = await self._parse_page(current_url, html, charset)
+            self.crawled_pages[current_url] = page_info
+            for link in page_info.links:
+                if link not in visited and link not in queued:
+                    queued.add(link)
                     urls_to_visit.append(link)
         
         return discovered
@@ -242,20 +449,21 @@ class AsyncWebCrawler:
         """Main discovery and crawl process"""
         self._log(f"🚀 Starting crawl of {self.base_url}")
         
-        async with httpx.AsyncClient(
-            timeout=self.timeout,
-            follow_redirects=True,
-            headers={'User-Agent': 'FreeLLMsTxt-Bot/1.0'}
-        ) as client:
+        async with self._client_scope() as client:
             
             sitemap_urls = []
-            
-            # Check robots.txt
             robots_url = f"{self.base_url}/robots.txt"
+            candidates = [f"{self.base_url}{pattern}" for pattern in self.SITEMAP_VARIATIONS]
+            
+            # Check robots.txt while already probing the most common sitemap patterns
             self._log(f"🤖 Checking robots.txt")
-            robots_content = await self._fetch(client, robots_url)
+            robots_content, *contents = await asyncio.gather(
+                self._fetch(client, robots_url),
+                *[self._fetch(client, sitemap_url) for sitemap_url in candidates[:3]],
+                return_exceptions=True
+            )
             
-            if robots_content:
+            if isinstance(robots_content, bytes) and robots_content:
                 sitemap_urls = self._find_sitemaps_in_robots(robots_content)
                 if sitemap_urls:
                     self._log(f"✅ Found {len(sitemap_urls)} sitemap(s) in robots.txt")
@@ -263,10 +471,14 @@ class AsyncWebCrawler:
             # Try sitemap variations
             if not sitemap_urls:
                 self._log("🔎 Trying common sitemap patterns...")
-                for pattern in self.SITEMAP_VARIATIONS:
-                    sitemap_url = f"{self.base_url}{pattern}"
-                    content = await self._fetch(client, sitemap_url)
-                    if content and ('<urlset' in content or '<sitemapindex' in content):
+                if not any(self._is_sitemap(content) for content in contents):
+                    contents += await asyncio.gather(
+                        *[self._fetch(client, sitemap_url) for sitemap_url in candidates[3:]],
+                        return_exceptions=True
+                    )
+                # Keep declared priority: first valid variation wins
+                for sitemap_url, content in zip(candidates, contents):
+                    if self._is_sitemap(content):
                         self._log(f"✅ Found sitemap: {sitemap_url}")
                         sitemap_urls.append(sitemap_url)
                         break
@@ -287,14 +499,20 @@ class AsyncWebCrawler:
             
             # Crawl pages for content
             self._log("📝 Extracting page information...")
-            pages = []
+            sem = asyncio.Semaphore(self.concurrency)
+            
+            async def _fetch_and_parse(i: int, url: str) -> Optional[PageInfo]:
+                if url in self.crawled_pages:
+                    return self.crawled_pages[url]
+                async with sem:
+                    self._log(f"[{i}/{len(unique_urls)}] Fetching: {url}")
+                    html, charset = await self._fetch_page(client, url)
+                    return await self._parse_page(url, html, charset) if html else None
             
-            for i, url in enumerate(unique_urls, 1):
-                self._log(f"[{i}/{len(unique_urls)}] Fetching: {url}")
-                html = await self._fetch(client, url)
-                if html:
-                    page_info = self._extract_page_info(url, html)
-                    pages.append(page_info)
+            results = await asyncio.gather(
+                *[_fetch_and_parse(i, url) for i, url in enumerate(unique_urls, 1)]
+            )
+            pages = [page for page in results if page]
             
             self._log(f"✨ Complete! Crawled {len(pages)} pages")
             return pages, self.logs
@@ -302,6 +520,26 @@ class AsyncWebCrawler:
 
 # ============== Generator ==============
 
+def _clean_title(title: str) -> str:
+    """Strip common ' | Site' / ' - Site' suffixes from a page title"""
+    return title.split(' | ')[0].split(' - ')[0].strip()
+
+
+def _format_link(page: PageInfo) -> str:
+    """Format a page as a markdown list item with optional description"""
+    title = _clean_title(page.title) if page.title else page.url
+    if len(title) > 80:
+        title = title[:77] + "..."
+    if not title:
+        title = page.url.split('/')[-1] or "Page"
+    
+    link = f"- [{title}]({page.url})"
+    if page.description:
+        desc = page.description[:200] + "..." if len(page.description) > 200 else page.description
+        link += f": {desc}"
+    return link
+
+
 def generate_llms_txt(base_url: str, pages: list[PageInfo]) -> str:
     """Generate llms.txt content"""
     domain = urlparse(base_url).netloc
@@ -310,10 +548,11 @@ def generate_llms_txt(base_url: str, pages: list[PageInfo]) -> str:
     site_title = domain.replace('www.', '').split('.')[0].title()
     site_description = f"Documentation and resources from {domain}"
     
+    home_urls = {base_url.rstrip('/'), base_url.replace('://', '://www.').rstrip('/')}
     for page in pages:
-        if page.url.rstrip('/') == base_url.rstrip('/') or page.url.rstrip('/') == base_url.replace('://', '://www.').rstrip('/'):
+        if page.url.rstrip('/') in home_urls:
             if page.title:
-                site_title = page.title.split(' | ')[0].split(' - ')[0].strip()
+                site_title = _clean_title(page.title)
             if page.description:
                 site_description = page.description
             break
@@ -321,20 +560,18 @@ def generate_llms_txt(base_url: str, pages: list[PageInfo]) -> str:
     # Categorize pages
     categories: dict[str, list[PageInfo]] = {}
     for page in pages:
-        parsed = urlparse(page.url)
-        path_parts = [p for p in parsed.path.split('/') if p]
-        
-        if not path_parts:
+        if not page.path_parts:
             category = "Main"
         else:
-            category = path_parts[0].replace('-', ' ').replace('_', ' ').title()
+            category = page.path_parts[0].replace('-', ' ').replace('_', ' ').title()
         
         if category not in categories:
             categories[category] = []
         categories[category].append(page)
     
     # Build output
-    lines = [f"# {site_title}", "", f"> {site_description}", ""]
+    buf = io.StringIO()
+    buf.write(f"# {site_title}\n\n> {site_description}\n\n")
     
     sorted_categories = sorted(categories.keys(), key=lambda x: (x != "Main", x))
     
@@ -342,42 +579,82 @@ def generate_llms_txt(base_url: str, pages: list[PageInfo]) -> str:
         cat_pages = categories[category]
         
         if category == "Main" and len(cat_pages) == 1:
-            page = cat_pages[0]
-            title = page.title.split(' | ')[0].split(' - ')[0].strip() if page.title else page.url
-            if len(title) > 80:
-                title = title[:77] + "..."
-            link = f"- [{title}]({page.url})"
-            if page.description:
-                desc = page.description[:200] + "..." if len(page.description) > 200 else page.description
-                link += f": {desc}"
-            lines.append(link)
+            buf.write(_format_link(cat_pages[0]) + "\n")
         else:
-            lines.append(f"## {category}")
-            lines.append("")
+            buf.write(f"## {category}\n\n")
             
             for page in sorted(cat_pages, key=lambda p: p.url):
-                title = page.title.split(' | ')[0].split(' - ')[0].strip() if page.title else page.url
-                if len(title) > 80:
-                    title = title[:77] + "..."
-                if not title:
-                    title = page.url.split('/')[-1] or "Page"
-                
-                link = f"- [{title}]({page.url})"
-                if page.description:
-                    desc = page.description[:200] + "..." if len(page.description) > 200 else page.description
-                    link += f": {desc}"
-                lines.append(link)
+                buf.write(_format_link(page) + "\n")
             
-            lines.append("")
+            buf.write("\n")
     
-    lines.extend([
-        "",
-        "---",
-        f"Generated by FreeLLMsTxt on {datetime.now().strftime('%Y-%m-%d')}",
-        f"Source: {base_url}"
-    ])
+    buf.write("\n---\n")
+    buf.write(f"Generated by FreeLLMsTxt on {datetime.now().strftime('%Y-%m-%d')}\n")
+    buf.write(f"Source: {base_url}")
     
-    return '\n'.join(lines)
+    return buf.getvalue()
+
+
+# ============== Shared HTTP Client ==============
+
+# Reused across requests so keep-alive connections carry over. This only shares the
+# connection pool: httpx has no DNS cache, so a host is resolved again whenever a new
+# connection is opened. The jar stores no cookies, so one caller's target site can't
+# set cookies that get sent on another caller's crawl.
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = _create_http_client()
+    return _http_client
+
+
+@app.on_event("shutdown")
+async def close_http_client():
+    if _http_client is not None:
+        await _http_client.aclose()
+
+
+# ============== Parser Pool ==============
+
+# HTML parsing is CPU-bound; run it in worker processes so it doesn't block the event loop
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _usable_cpus() -> int:
+    """CPUs this process may run on (honours taskset/cgroup affinity, unlike os.cpu_count)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS/Windows
+        return os.cpu_count() or 1
+
+
+def _new_parse_pool() -> ProcessPoolExecutor:
+    # spawn, not the default fork: forking from inside uvicorn's running loop and
+    # threads can copy held locks into the child
+    return ProcessPoolExecutor(max_workers=_usable_cpus(), mp_context=multiprocessing.get_context('spawn'))
+
+
+def _replace_parse_pool(broken: Executor):
+    """Replace the shared parse pool if it is the one that broke"""
+    global _parse_pool
+    if _parse_pool is broken:
+        broken.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = _new_parse_pool()
+
+
+@app.on_event("startup")
+async def start_parse_pool():
+    global _parse_pool
+    _parse_pool = _new_parse_pool()
+
+
+@app.on_event("shutdown")
+async def stop_parse_pool():
+    if _parse_pool is not None:
+        _parse_pool.shutdown(cancel_futures=True)
 
 
 # ============== Routes ==============
@@ -391,7 +668,7 @@ async def home(request: Request):
 async def generate(url: str = Form(...), max_urls: int = Form(20)):
     """Generate llms.txt for a URL"""
     try:
-        crawler = AsyncWebCrawler(base_url=url, max_urls=max_urls)
+        crawler = AsyncWebCrawler(base_url=url, max_urls=max_urls, client=get_http_client(), executor=_parse_pool)
         pages, logs = await crawler.discover_and_crawl()
         
         if not pages:
@@ -423,7 +700,7 @@ async def generate(url: str = Form(...), max_urls: int = Form(20)):
 @app.get("/llms.txt", response_class=PlainTextResponse)
 async def get_llms_txt(url: str, max_urls: int = 20):
     """Direct endpoint to get llms.txt as plain text"""
-    crawler = AsyncWebCrawler(base_url=url, max_urls=max_urls)
+    crawler = AsyncWebCrawler(base_url=url, max_urls=max_urls, client=get_http_client(), executor=_parse_pool)
     pages, _ = await crawler.discover_and_crawl()
     
     if not pages:
@@ -3,12 +3,16 @@ URL Crawler for llms.txt generation
 Handles robots.txt, sitemaps, and HTML link extraction
 """
 
-import re
+import asyncio
+import io
+import os
+import shelve
 import httpx
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 from urllib.parse import urljoin, urlparse
-from typing import Optional
-import xml.etree.ElementTree as ET
+from typing import AsyncIterator, Callable, Optional
+from lxml import etree
+from protego import Protego
 from dataclasses import dataclass, field
 from rich.console import Console
 
@@ -28,62 +32,52 @@ class PageInfo:
 class SitemapParser:
     """Parse XML sitemaps including sitemap indexes"""
     
-    SITEMAP_NS = {
-        'sm': 'http://www.sitemaps.org/schemas/sitemap/0.9',
-        'xhtml': 'http://www.w3.org/1999/xhtml'
-    }
+    # '{*}' matches the sitemap namespace as well as sitemaps that omit it
+    ENTRY_TAGS = ('{*}url', '{*}sitemap')
     
     @staticmethod
-    def parse(xml_content: str) -> tuple[list[str], list[str]]:
+    def parse(xml_content: bytes, limit: Optional[int] = None,
+              allow: Optional[Callable[[str], bool]] = None) -> tuple[list[str], list[str]]:
         """
-        Parse sitemap XML content.
+        Stream-parse sitemap XML content, stopping after limit page URLs.
+        Page URLs rejected by allow are skipped and don't count toward limit.
         Returns (urls, nested_sitemaps)
         """
         urls = []
         nested_sitemaps = []
+        seen = set()
         
         try:
-            # Remove namespace prefixes for easier parsing
-            xml_content = re.sub(r'xmlns[^"]*"[^"]*"', '', xml_content)
-            root = ET.fromstring(xml_content)
-            
-            # Check if it's a sitemap index
-            for sitemap in root.findall('.//sitemap'):
-                loc = sitemap.find('loc')
-                if loc is not None and loc.text:
-                    nested_sitemaps.append(loc.text.strip())
-            
-            # Get regular URLs
-            for url in root.findall('.//url'):
-                loc = url.find('loc')
-                if loc is not None and loc.text:
-                    urls.append(loc.text.strip())
+            for _, elem in etree.iterparse(io.BytesIO(xml_content), events=('end',),
+                                           tag=SitemapParser.ENTRY_TAGS, resolve_entities=False):
+                loc = (elem.findtext('{*}loc') or '').strip()
+                if loc:
+                    # Check if it's a sitemap index entry
+                    if elem.tag.rpartition('}')[2] == 'sitemap':
+                        nested_sitemaps.append(loc)
+                    elif loc not in seen and (allow is None or allow(loc)):
+                        seen.add(loc)
+                        urls.append(loc)
+                
+                # Drop finished entries so memory stays flat on huge sitemaps
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+                
+                if limit is not None and len(urls) >= limit:
+                    break
                     
-        except ET.ParseError as e:
+        except etree.XMLSyntaxError as e:
             console.print(f"[yellow]Warning: Could not parse sitemap XML: {e}[/yellow]")
         
         return urls, nested_sitemaps
 
 
-class RobotsTxtParser:
-    """Parse robots.txt to find sitemap URLs"""
-    
-    @staticmethod
-    def find_sitemaps(robots_content: str) -> list[str]:
-        """Extract sitemap URLs from robots.txt"""
-        sitemaps = []
-        for line in robots_content.splitlines():
-            line = line.strip()
-            if line.lower().startswith('sitemap:'):
-                sitemap_url = line.split(':', 1)[1].strip()
-                if sitemap_url:
-                    sitemaps.append(sitemap_url)
-        return sitemaps
-
-
 class WebCrawler:
     """Main crawler that discovers URLs from a website"""
     
+    USER_AGENT = 'FreeLLMsTxt-Bot/1.0 (Generating llms.txt)'
+    
     SITEMAP_VARIATIONS = [
         '/sitemap.xml',
         '/sitemap_index.xml',
@@ -96,20 +90,55 @@ class WebCrawler:
         '/page-sitemap.xml',
     ]
     
-    def __init__(self, base_url: str, max_urls: int = 20, timeout: float = 10.0):
+    # Only the head of robots.txt matters; some sites serve multi-MB files
+    MAX_ROBOTS_BYTES = 500_000
+    
+    # Child sitemaps fetched at once when walking a sitemap index
+    SITEMAP_CONCURRENCY = 8
+    
+    def __init__(self, base_url: str, max_urls: int = 20, timeout: float = 10.0,
+                 client: Optional[httpx.AsyncClient] = None, concurrency: int = 16,
+                 cache_dir: Optional[str] = None):
         self.base_url = self._normalize_url(base_url)
+        self._base_netloc = urlparse(self.base_url).netloc
         self.max_urls = max_urls
         self.timeout = timeout
+        self.concurrency = concurrency
         self.discovered_urls: set[str] = set()
         self.pages: list[PageInfo] = []
-        self.client = httpx.Client(
-            timeout=timeout,
+        # Per-run caches so robots.txt and each sitemap are fetched and parsed once
+        self._robots: Optional[Protego] = None
+        self._robots_fetched = False
+        self._sitemap_cache: dict[str, asyncio.Future[tuple[list[str], list[str]]]] = {}
+        # Optional on-disk {url: (etag, last_modified, content_type, body)} store
+        # so repeat runs can revalidate with conditional requests. Opened before
+        # the client so a bad cache_dir fails without leaking a connection pool.
+        self._http_cache: Optional[shelve.Shelf] = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._http_cache = shelve.open(os.path.join(cache_dir, 'http-cache'))
+        # Callers may share their own pooled client; otherwise we own one.
+        # Nearly every request goes to the same origin, so one HTTP/2 connection
+        # kept alive for the whole run multiplexes them all.
+        self._owns_client = client is None
+        self.client = client or self._create_client()
+    
+    def _create_client(self) -> httpx.AsyncClient:
+        """Build the crawler's own pooled HTTP/2 client"""
+        return httpx.AsyncClient(
+            http2=True,
+            timeout=self.timeout,
             follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=max(32, self.concurrency),
+                max_keepalive_connections=max(32, self.concurrency),
+                keepalive_expiry=30.0
+            ),
             headers={
-                'User-Agent': 'FreeLLMsTxt-Bot/1.0 (Generating llms.txt)'
+                'User-Agent': self.USER_AGENT
             }
         )
-        
+    
     def _normalize_url(self, url: str) -> str:
         """Ensure URL has scheme"""
         if not url.startswith(('http://', 'https://')):
@@ -118,71 +147,143 @@ class WebCrawler:
     
     def _is_same_domain(self, url: str) -> bool:
         """Check if URL belongs to the same domain"""
-        base_domain = urlparse(self.base_url).netloc
-        url_domain = urlparse(url).netloc
-        return base_domain == url_domain
+        return urlparse(url).netloc == self._base_netloc
     
-    def _fetch(self, url: str) -> Optional[str]:
-        """Fetch URL content"""
+    async def _get(self, url: str) -> Optional[httpx.Response]:
+        """GET a URL, returning None on HTTP or network errors"""
+        cached = self._http_cache.get(url) if self._http_cache is not None else None
+        headers = {}
+        if cached:
+            etag, last_modified, _, _ = cached
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        
         try:
-            response = self.client.get(url)
+            response = await self.client.get(url, headers=headers)
+            if response.status_code == 304 and cached:
+                # Unchanged since the last run: serve the stored body
+                return httpx.Response(200, headers={'Content-Type': cached[2]},
+                                      content=cached[3], request=response.request)
             response.raise_for_status()
-            return response.text
         except httpx.HTTPError as e:
             console.print(f"[dim]Failed to fetch {url}: {e}[/dim]")
             return None
+        
+        if self._http_cache is not None:
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if etag or last_modified:
+                self._http_cache[url] = (etag, last_modified,
+                                         response.headers.get('Content-Type', ''), response.content)
+        return response
+    
+    async def _fetch(self, url: str) -> Optional[str]:
+        """Fetch URL content"""
+        response = await self._get(url)
+        return response.text if response else None
     
-    def _get_robots_txt(self) -> Optional[str]:
-        """Fetch robots.txt"""
+    async def _get_robots_txt(self) -> Optional[Protego]:
+        """Fetch and parse robots.txt (once per run)"""
+        if self._robots_fetched:
+            return self._robots
+        self._robots_fetched = True
+        
         robots_url = f"{self.base_url}/robots.txt"
         console.print(f"[blue]Checking robots.txt:[/blue] {robots_url}")
-        return self._fetch(robots_url)
+        response = await self._get(robots_url)
+        if not response:
+            return None
+        self._robots = Protego.parse(response.content[:self.MAX_ROBOTS_BYTES].decode('utf-8', 'ignore'))
+        return self._robots
+    
+    def can_fetch(self, url: str) -> bool:
+        """Check robots.txt rules for our user agent (everything is allowed without a robots.txt)"""
+        return self._robots is None or self._robots.can_fetch(url, self.USER_AGENT)
+    
+    async def _load_sitemap(self, sitemap_url: str) -> tuple[list[str], list[str]]:
+        """Download and parse one sitemap"""
+        response = await self._get(sitemap_url)
+        return SitemapParser.parse(response.content, self.max_urls, self.can_fetch) if response else ([], [])
+    
+    async def _get_sitemap(self, sitemap_url: str) -> tuple[list[str], list[str]]:
+        """Fetch and parse a sitemap once per run, sharing an in-flight download between callers"""
+        task = self._sitemap_cache.get(sitemap_url)
+        # A walk that stopped early cancels its downloads; those are started afresh
+        if task is None or task.cancelled():
+            task = self._sitemap_cache[sitemap_url] = asyncio.ensure_future(self._load_sitemap(sitemap_url))
+        return await task
     
-    def _try_sitemap_variations(self) -> list[str]:
+    async def _try_sitemap_variations(self) -> list[str]:
         """Try common sitemap URL patterns"""
         console.print("[blue]Trying common sitemap URL patterns...[/blue]")
         found_sitemaps = []
         
         for pattern in self.SITEMAP_VARIATIONS:
             sitemap_url = f"{self.base_url}{pattern}"
-            content = self._fetch(sitemap_url)
-            if content and ('<urlset' in content or '<sitemapindex' in content):
+            response = await self._get(sitemap_url)
+            content = response.content if response else None
+            if content and (b'<urlset' in content or b'<sitemapindex' in content):
                 console.print(f"[green]✓ Found sitemap:[/green] {sitemap_url}")
+                # Keep the parse so the sitemap walk doesn't download it again
+                parsed = asyncio.get_running_loop().create_future()
+                parsed.set_result(SitemapParser.parse(content, self.max_urls, self.can_fetch))
+                self._sitemap_cache[sitemap_url] = parsed
                 found_sitemaps.append(sitemap_url)
                 break  # Use first valid sitemap
         
         return found_sitemaps
     
-    def _crawl_sitemaps(self, sitemap_urls: list[str], depth: int = 0) -> list[str]:
-        """Recursively crawl sitemaps and return all URLs"""
+    async def _iter_sitemap_urls(self, sitemap_urls: list[str], depth: int = 0,
+                                 sem: Optional[asyncio.Semaphore] = None) -> AsyncIterator[str]:
+        """Recursively walk sitemaps, yielding URLs as soon as each sitemap is parsed"""
         if depth > 3:  # Prevent infinite recursion
-            return []
+            return
         
-        all_urls = []
+        if sem is None:
+            sem = asyncio.Semaphore(self.SITEMAP_CONCURRENCY)
         
-        for sitemap_url in sitemap_urls:
-            console.print(f"[blue]Parsing sitemap:[/blue] {sitemap_url}")
-            content = self._fetch(sitemap_url)
-            
-            if not content:
-                continue
-                
-            urls, nested_sitemaps = SitemapParser.parse(content)
-            all_urls.extend(urls)
-            
-            if nested_sitemaps:
-                console.print(f"[cyan]Found {len(nested_sitemaps)} nested sitemap(s)[/cyan]")
-                all_urls.extend(self._crawl_sitemaps(nested_sitemaps, depth + 1))
+        async def fetch_one(sitemap_url: str) -> tuple[list[str], list[str]]:
+            async with sem:
+                console.print(f"[blue]Parsing sitemap:[/blue] {sitemap_url}")
+                return await self._get_sitemap(sitemap_url)
         
-        return all_urls
+        # Fetch every sitemap at this level concurrently, but yield in input order
+        # so the URL order matches a serial walk
+        tasks = [asyncio.ensure_future(fetch_one(url)) for url in sitemap_urls]
+        try:
+            for task in tasks:
+                urls, nested_sitemaps = await task
+                for url in urls:
+                    yield url
+                
+                if nested_sitemaps:
+                    console.print(f"[cyan]Found {len(nested_sitemaps)} nested sitemap(s)[/cyan]")
+                    nested = self._iter_sitemap_urls(nested_sitemaps, depth + 1, sem)
+                    try:
+                        async for url in nested:
+                            yield url
+                    finally:
+                        await nested.aclose()
+        finally:
+            # The consumer may stop early once it has enough URLs; collect every
+            # outcome so a sitemap that already failed isn't reported as an
+            # exception that was never retrieved
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
     
     def _extract_links_from_html(self, html: str, base_url: str) -> list[str]:
         """Extract internal links from HTML content"""
-        soup = BeautifulSoup(html, 'lxml')
+        return self._extract_links(LexborHTMLParser(html), base_url)
+    
+    def _extract_links(self, tree: LexborHTMLParser, base_url: str) -> list[str]:
+        """Extract internal links from an already parsed page"""
         links = []
         
-        for anchor in soup.find_all('a', href=True):
-            href = anchor['href']
+        for anchor in tree.css('a[href]'):
+            href = anchor.attrs.get('href') or ''
             
             # Skip fragment-only links, javascript, mailto, etc.
             if href.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
@@ -202,36 +303,36 @@ class WebCrawler:
     
     def _extract_page_info(self, url: str, html: str) -> PageInfo:
         """Extract title, description, and content from HTML"""
-        soup = BeautifulSoup(html, 'lxml')
+        tree = LexborHTMLParser(html)
         
         # Extract title
         title = ""
-        title_tag = soup.find('title')
+        title_tag = tree.css_first('title')
         if title_tag:
-            title = title_tag.get_text(strip=True)
+            title = title_tag.text(strip=True)
         
         # Extract meta description
         description = ""
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        if meta_desc and meta_desc.get('content'):
-            description = meta_desc['content']
+        meta_desc = tree.css_first('meta[name="description"]')
+        if meta_desc and meta_desc.attrs.get('content'):
+            description = meta_desc.attrs['content']
         
         # Extract OG description as fallback
         if not description:
-            og_desc = soup.find('meta', attrs={'property': 'og:description'})
-            if og_desc and og_desc.get('content'):
-                description = og_desc['content']
+            og_desc = tree.css_first('meta[property="og:description"]')
+            if og_desc and og_desc.attrs.get('content'):
+                description = og_desc.attrs['content']
         
         # Extract content preview (first significant paragraph)
         content_preview = ""
-        for tag in soup.find_all(['p', 'article', 'main']):
-            text = tag.get_text(strip=True)
+        for tag in tree.css('p, article, main'):
+            text = tag.text(strip=True)
             if len(text) > 100:
                 content_preview = text[:500] + "..." if len(text) > 500 else text
                 break
         
-        # Extract links for further crawling
-        links = self._extract_links_from_html(html, url)
+        # Extract links for further crawling, reusing the same tree
+        links = self._extract_links(tree, url)
         
         return PageInfo(
             url=url,
@@ -241,11 +342,11 @@ class WebCrawler:
             links=links
         )
     
-    def _crawl_from_homepage(self) -> list[str]:
+    async def _crawl_from_homepage(self) -> list[str]:
         """Fallback: crawl starting from homepage"""
         console.print("[yellow]No sitemap found. Crawling from homepage...[/yellow]")
         
-        urls_to_visit = [self.base_url]
+        urls_to_visit = [self.base_url] if self.can_fetch(self.base_url) else []
         visited = set()
         discovered = []
         
@@ -258,7 +359,7 @@ class WebCrawler:
             visited.add(current_url)
             console.print(f"[dim]Crawling:[/dim] {current_url}")
             
-            html = self._fetch(current_url)
+            html = await self._fetch(current_url)
             if not html:
                 continue
             
@@ -267,60 +368,69 @@ class WebCrawler:
             # Extract links and add to queue
             links = self._extract_links_from_html(html, current_url)
             for link in links:
-                if link not in visited and link not in urls_to_visit:
+                if link not in visited and link not in urls_to_visit and self.can_fetch(link):
                     urls_to_visit.append(link)
         
         return discovered
     
-    def discover_urls(self) -> list[str]:
-        """Main discovery process"""
+    async def iter_discovered_urls(self) -> AsyncIterator[str]:
+        """Main discovery process, yielding unique URLs (up to max_urls) as they are found"""
         console.print(f"\n[bold blue]🔍 Discovering URLs for:[/bold blue] {self.base_url}\n")
         
         sitemap_urls = []
         
         # Step 1: Check robots.txt
-        robots_content = self._get_robots_txt()
-        if robots_content:
-            sitemap_urls = RobotsTxtParser.find_sitemaps(robots_content)
+        robots = await self._get_robots_txt()
+        if robots:
+            sitemap_urls = list(robots.sitemaps)
             if sitemap_urls:
                 console.print(f"[green]✓ Found {len(sitemap_urls)} sitemap(s) in robots.txt[/green]")
         
         # Step 2: Try sitemap variations if none found
         if not sitemap_urls:
-            sitemap_urls = self._try_sitemap_variations()
+            sitemap_urls = await self._try_sitemap_variations()
+        
+        seen: set[str] = set()
         
-        # Step 3: Parse sitemaps
-        all_urls = []
+        # Step 3: Parse sitemaps, stopping as soon as the limit is reached
         if sitemap_urls:
-            all_urls = self._crawl_sitemaps(sitemap_urls)
-            console.print(f"[green]✓ Found {len(all_urls)} URLs from sitemaps[/green]")
+            found = self._iter_sitemap_urls(sitemap_urls)
+            try:
+                async for url in found:
+                    # Disallowed URLs never reach the crawl, so they cost no request
+                    if url not in seen and self.can_fetch(url):
+                        seen.add(url)
+                        yield url
+                        if len(seen) >= self.max_urls:
+                            break
+            finally:
+                await found.aclose()
+            console.print(f"[green]✓ Found {len(seen)} URLs from sitemaps[/green]")
         
         # Step 4: Fallback to HTML crawling
-        if not all_urls:
-            all_urls = self._crawl_from_homepage()
+        if not seen:
+            for url in await self._crawl_from_homepage():
+                if url not in seen:
+                    seen.add(url)
+                    yield url
+                    if len(seen) >= self.max_urls:
+                        break
         
-        # Limit and dedupe URLs
-        unique_urls = list(dict.fromkeys(all_urls))[:self.max_urls]
-        console.print(f"\n[bold green]✓ Discovered {len(unique_urls)} unique URLs[/bold green]\n")
-        
-        return unique_urls
+        console.print(f"\n[bold green]✓ Discovered {len(seen)} unique URLs[/bold green]\n")
     
-    def crawl_pages(self, urls: list[str]) -> list[PageInfo]:
-        """Crawl pages and extract information"""
-        console.print("[bold blue]📄 Extracting page information...[/bold blue]\n")
-        
-        pages = []
-        for i, url in enumerate(urls, 1):
-            console.print(f"[dim][{i}/{len(urls)}] Fetching:[/dim] {url}")
-            
-            html = self._fetch(url)
-            if html:
-                page_info = self._extract_page_info(url, html)
-                pages.append(page_info)
-        
-        return pages
+    async def discover_urls_async(self) -> list[str]:
+        """Discover URLs and return them all at once"""
+        return [url async for url in self.iter_discovered_urls()]
     
-    def close(self):
-        """Close HTTP client"""
-        self.client.close()
-
+    async def crawl_one(self, url: str) -> Optional[PageInfo]:
+        """Fetch a single page and extract its information"""
+        html = await self._fetch(url)
+        return self._extract_page_info(url, html) if html else None
+    
+    async def close(self):
+        """Close HTTP client (if created by the crawler) and the response cache"""
+        if self._owns_client:
+            await self.client.aclose()
+        if self._http_cache is not None:
+            self._http_cache.close()
+            self._http_cache = None
@@ -5,9 +5,11 @@ Creates a well-formatted llms.txt file from crawled page data
 
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Iterator
 from urllib.parse import urlparse
 from crawler import PageInfo
 from rich.console import Console
+from rich.markup import escape
 
 console = Console()
 
@@ -24,11 +26,20 @@ class LLMsTxtConfig:
 class LLMsTxtGenerator:
     """Generate llms.txt from crawled pages"""
     
+    PREVIEW_LINES = 20
+    
     def __init__(self, base_url: str, pages: list[PageInfo], config: LLMsTxtConfig = None):
         self.base_url = base_url
         self.pages = pages
         self.config = config or LLMsTxtConfig()
         self.domain = urlparse(base_url).netloc
+        self.preview_lines: list[str] = []
+        self.line_count = 0
+        # Resolve the config flags once instead of re-checking them for every page
+        self._format_link = (
+            self._format_described_link if self.config.include_descriptions else self._format_title_link
+        )
+        self._render_pages = self._render_grouped if self.config.group_by_path else self._render_flat
     
     def _get_site_title(self) -> str:
         """Extract site title from homepage or domain"""
@@ -72,8 +83,8 @@ class LLMsTxtGenerator:
         
         return categories
     
-    def _format_link(self, page: PageInfo) -> str:
-        """Format a single page as a markdown link with optional description"""
+    def _format_title_link(self, page: PageInfo) -> str:
+        """Format a single page as a markdown link"""
         title = page.title if page.title else page.url
         
         # Clean up title
@@ -85,9 +96,13 @@ class LLMsTxtGenerator:
         if len(title) > 80:
             title = title[:77] + "..."
         
-        link = f"- [{title}]({page.url})"
+        return f"- [{title}]({page.url})"
+    
+    def _format_described_link(self, page: PageInfo) -> str:
+        """Format a single page as a markdown link followed by its description"""
+        link = self._format_title_link(page)
         
-        if self.config.include_descriptions and page.description:
+        if page.description:
             desc = page.description
             if len(desc) > self.config.max_description_length:
                 desc = desc[:self.config.max_description_length - 3] + "..."
@@ -95,60 +110,74 @@ class LLMsTxtGenerator:
         
         return link
     
-    def generate(self) -> str:
-        """Generate the llms.txt content"""
-        lines = []
+    def _render_grouped(self) -> Iterator[str]:
+        """Yield page links grouped into sections by path"""
+        # Group pages by category
+        categories = self._categorize_pages()
+        
+        # Sort categories, putting "Main" first
+        sorted_categories = sorted(categories.keys(), key=lambda x: (x != "Main", x))
         
+        for category in sorted_categories:
+            pages = categories[category]
+            
+            if category == "Main" and len(pages) == 1:
+                # Just list the homepage without a section header
+                yield self._format_link(pages[0])
+            else:
+                yield f"## {category}"
+                yield ""
+                
+                for page in sorted(pages, key=lambda p: p.url):
+                    yield self._format_link(page)
+                
+                yield ""
+    
+    def _render_flat(self) -> Iterator[str]:
+        """Yield page links as a simple flat list"""
+        for page in sorted(self.pages, key=lambda p: p.url):
+            yield self._format_link(page)
+    
+    def _render_chunks(self) -> Iterator[str]:
+        """Yield the llms.txt content line by line"""
         # Header
         site_title = self._get_site_title()
         site_description = self._get_site_description()
         
-        lines.append(f"# {site_title}")
-        lines.append("")
-        lines.append(f"> {site_description}")
-        lines.append("")
+        yield f"# {site_title}"
+        yield ""
+        yield f"> {site_description}"
+        yield ""
         
-        if self.config.group_by_path:
-            # Group pages by category
-            categories = self._categorize_pages()
-            
-            # Sort categories, putting "Main" first
-            sorted_categories = sorted(categories.keys(), key=lambda x: (x != "Main", x))
-            
-            for category in sorted_categories:
-                pages = categories[category]
-                
-                if category == "Main" and len(pages) == 1:
-                    # Just list the homepage without a section header
-                    lines.append(self._format_link(pages[0]))
-                else:
-                    lines.append(f"## {category}")
-                    lines.append("")
-                    
-                    for page in sorted(pages, key=lambda p: p.url):
-                        lines.append(self._format_link(page))
-                    
-                    lines.append("")
-        else:
-            # Simple flat list
-            for page in sorted(self.pages, key=lambda p: p.url):
-                lines.append(self._format_link(page))
+        yield from self._render_pages()
         
         # Footer
-        lines.append("")
-        lines.append("---")
-        lines.append(f"Generated by FreeLLMsTxt on {datetime.now().strftime('%Y-%m-%d')}")
-        lines.append(f"Source: {self.base_url}")
-        
-        return '\n'.join(lines)
+        yield ""
+        yield "---"
+        yield f"Generated by FreeLLMsTxt on {datetime.now().strftime('%Y-%m-%d')}"
+        yield f"Source: {self.base_url}"
+    
+    def generate(self) -> str:
+        """Generate the llms.txt content"""
+        return '\n'.join(self._render_chunks())
     
     def save(self, filepath: str = "llms.txt"):
-        """Save llms.txt to file"""
-        content = self.generate()
+        """
+        Write llms.txt to file, streaming lines as they are rendered instead of
+        building the whole document first. Keeps the first PREVIEW_LINES lines in
+        preview_lines and the total in line_count.
+        """
+        self.preview_lines = []
+        self.line_count = 0
         
         with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+            for line in self._render_chunks():
+                if self.line_count:
+                    f.write('\n')
+                f.write(line)
+                if self.line_count < self.PREVIEW_LINES:
+                    self.preview_lines.append(line)
+                self.line_count += 1
         
-        console.print(f"\n[bold green]✓ Saved to {filepath}[/bold green]")
+        console.print(f"\n[bold green]✓ Saved to {escape(filepath)}[/bold green]")
         return filepath
-
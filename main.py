@@ -7,15 +7,22 @@ Usage:
     python main.py https://example.com --max-urls 50 --output custom.txt
 """
 
-import click
+import argparse
+import asyncio
+import os
+from typing import TYPE_CHECKING, Optional
 from rich.console import Console
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from crawler import WebCrawler
-from generator import LLMsTxtGenerator, LLMsTxtConfig
+
+# The crawler and generator pull in httpx, selectolax and friends; they are
+# imported inside _run so --help and argument errors return immediately
+if TYPE_CHECKING:
+    from crawler import PageInfo, WebCrawler
 
 console = Console()
 
+# Fetching is network-bound, so allow several requests in flight per core
+DEFAULT_JOBS = min(32, (os.cpu_count() or 4) * 4)
+
 
 BANNER = """
 [bold cyan]╔═══════════════════════════════════════════════════════════╗
@@ -29,91 +36,161 @@ BANNER = """
 """
 
 
-@click.command()
-@click.argument('url')
-@click.option('--max-urls', '-m', default=20, help='Maximum number of URLs to crawl (default: 20)')
-@click.option('--output', '-o', default='llms.txt', help='Output filename (default: llms.txt)')
-@click.option('--timeout', '-t', default=10.0, help='Request timeout in seconds (default: 10)')
-@click.option('--no-descriptions', is_flag=True, help='Exclude page descriptions from output')
-@click.option('--flat', is_flag=True, help='Output as flat list without categories')
-def main(url: str, max_urls: int, output: str, timeout: float, no_descriptions: bool, flat: bool):
-    """
-    Generate an llms.txt file for any website.
-    
-    URL: The website URL to crawl (e.g., https://example.com)
-    
-    The tool will:
+def main():
+    """Parse command-line options and run the generator"""
+    parser = argparse.ArgumentParser(
+        description="Generate an llms.txt file for any website.",
+        epilog=(
+            "The tool will:\n"
+            "  1. Check robots.txt for sitemap references\n"
+            "  2. Try common sitemap URL patterns if none found\n"
+            "  3. Parse nested sitemaps recursively\n"
+            "  4. Fall back to HTML link crawling if no sitemap exists\n"
+            "  5. Generate a well-formatted llms.txt file"
+        ),
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('url', help='The website URL to crawl (e.g., https://example.com)')
+    parser.add_argument('--max-urls', '-m', type=int, default=20, help='Maximum number of URLs to crawl (default: 20)')
+    parser.add_argument('--output', '-o', default='llms.txt', help='Output filename (default: llms.txt)')
+    parser.add_argument('--timeout', '-t', type=float, default=10.0, help='Request timeout in seconds (default: 10)')
+    parser.add_argument('--no-descriptions', action='store_true', help='Exclude page descriptions from output')
+    parser.add_argument('--flat', action='store_true', help='Output as flat list without categories')
+    parser.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                        help=f'Number of pages fetched concurrently (default: {DEFAULT_JOBS})')
+    parser.add_argument('--cache-dir', default=None,
+                        help='Directory for an HTTP cache; repeat runs send conditional requests (default: off)')
+    args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
     
-    \b
-    1. Check robots.txt for sitemap references
-    2. Try common sitemap URL patterns if none found
-    3. Parse nested sitemaps recursively
-    4. Fall back to HTML link crawling if no sitemap exists
-    5. Generate a well-formatted llms.txt file
-    """
     console.print(BANNER)
     
-    # Initialize crawler
-    crawler = WebCrawler(base_url=url, max_urls=max_urls, timeout=timeout)
-    
     try:
-        # Discover URLs
-        urls = crawler.discover_urls()
-        
-        if not urls:
-            console.print("[bold red]✗ No URLs discovered. Please check the URL and try again.[/bold red]")
-            return
-        
-        # Crawl pages for content
-        pages = crawler.crawl_pages(urls)
-        
-        if not pages:
-            console.print("[bold red]✗ Could not extract any page information.[/bold red]")
-            return
-        
-        # Generate llms.txt
-        config = LLMsTxtConfig(
-            include_descriptions=not no_descriptions,
-            group_by_path=not flat
-        )
-        
-        generator = LLMsTxtGenerator(
-            base_url=crawler.base_url,
-            pages=pages,
-            config=config
-        )
-        
-        # Save output
-        generator.save(output)
-        
-        # Show summary
-        console.print(Panel(
-            f"[green]Successfully generated llms.txt![/green]\n\n"
-            f"📊 [bold]Stats:[/bold]\n"
-            f"   • URLs discovered: {len(urls)}\n"
-            f"   • Pages crawled: {len(pages)}\n"
-            f"   • Output file: {output}\n\n"
-            f"[dim]Open {output} to see the generated content.[/dim]",
-            title="[bold]✨ Complete[/bold]",
-            border_style="green"
-        ))
-        
-        # Preview the output
-        console.print("\n[bold]📄 Preview:[/bold]\n")
-        content = generator.generate()
-        preview_lines = content.split('\n')[:20]
-        for line in preview_lines:
-            console.print(f"  [dim]{line}[/dim]")
-        if len(content.split('\n')) > 20:
-            console.print(f"  [dim]... ({len(content.split(chr(10))) - 20} more lines)[/dim]")
-        
+        asyncio.run(_run(args.url, args.max_urls, args.output, args.timeout, args.no_descriptions, args.flat,
+                         args.cache_dir, args.jobs))
     except KeyboardInterrupt:
         console.print("\n[yellow]Operation cancelled by user.[/yellow]")
     except Exception as e:
         console.print(f"[bold red]Error: {e}[/bold red]")
         raise
+
+
+async def _discover_and_crawl(crawler: "WebCrawler") -> tuple[int, list["PageInfo"]]:
+    """Feed discovered URLs through a queue to concurrent page workers"""
+    queue: asyncio.Queue = asyncio.Queue()
+    results: dict[int, PageInfo] = {}
+    discovered = 0
+    
+    async def fill():
+        nonlocal discovered
+        try:
+            async for url in crawler.iter_discovered_urls():
+                discovered += 1
+                if discovered == 1:
+                    console.print("[bold blue]📄 Extracting page information...[/bold blue]\n")
+                queue.put_nowait((discovered, url))
+        finally:
+            # One stop marker per worker
+            for _ in range(crawler.concurrency):
+                queue.put_nowait(None)
+    
+    async def worker():
+        while (item := await queue.get()) is not None:
+            i, url = item
+            console.print(f"[dim][{i}] Fetching:[/dim] {url}")
+            page = await crawler.crawl_one(url)
+            if page:
+                results[i] = page
+    
+    tasks = [asyncio.ensure_future(fill())]
+    tasks += [asyncio.ensure_future(worker()) for _ in range(crawler.concurrency)]
+    try:
+        await asyncio.gather(*tasks)
     finally:
-        crawler.close()
+        # A failure in discovery or any worker (or Ctrl-C) stops the whole pipeline
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    # Keep discovery order regardless of which fetch finished first
+    return discovered, [results[i] for i in sorted(results)]
+
+
+async def _run(url: str, max_urls: int, output: str, timeout: float, no_descriptions: bool, flat: bool,
+               cache_dir: Optional[str] = None, jobs: int = DEFAULT_JOBS):
+    """Crawl the site and write llms.txt"""
+    from rich.console import Group
+    from rich.panel import Panel
+    from rich.table import Table
+    from rich.text import Text
+    from crawler import WebCrawler
+    from generator import LLMsTxtGenerator, LLMsTxtConfig
+    
+    # Initialize crawler
+    crawler = WebCrawler(base_url=url, max_urls=max_urls, timeout=timeout, cache_dir=cache_dir,
+                         concurrency=jobs)
+    
+    try:
+        # Discover and crawl in one pipeline: pages start downloading as soon as
+        # the first sitemap yields URLs instead of after discovery finishes
+        discovered, pages = await _discover_and_crawl(crawler)
+    finally:
+        await crawler.close()
+    
+    if not discovered:
+        console.print("[bold red]✗ No URLs discovered. Please check the URL and try again.[/bold red]")
+        return
+    
+    if not pages:
+        console.print("[bold red]✗ Could not extract any page information.[/bold red]")
+        return
+    
+    # Generate llms.txt
+    config = LLMsTxtConfig(
+        include_descriptions=not no_descriptions,
+        group_by_path=not flat
+    )
+    
+    generator = LLMsTxtGenerator(
+        base_url=crawler.base_url,
+        pages=pages,
+        config=config
+    )
+    
+    # Stream straight to disk; save() keeps the first lines for the preview
+    generator.save(output)
+    
+    # Show summary
+    # Values go in as Text cells, so they skip the markup parser and user-supplied
+    # paths like out[x].txt print verbatim
+    stats = Table.grid(padding=(0, 1))
+    stats.add_column()
+    stats.add_column(style="bold")
+    stats.add_row("   • URLs discovered:", Text(str(discovered)))
+    stats.add_row("   • Pages crawled:", Text(str(len(pages))))
+    stats.add_row("   • Output file:", Text(output))
+    
+    console.print(Panel(
+        Group(
+            Text("Successfully generated llms.txt!", style="green"),
+            Text(),
+            Text("📊 Stats:", style="bold"),
+            stats,
+            Text(),
+            Text(f"Open {output} to see the generated content.", style="dim")
+        ),
+        title="[bold]✨ Complete[/bold]",
+        border_style="green"
+    ))
+    
+    # Preview the output
+    console.print("\n[bold]📄 Preview:[/bold]\n")
+    preview = "\n".join("  " + line for line in generator.preview_lines)
+    hidden = generator.line_count - len(generator.preview_lines)
+    if hidden > 0:
+        preview += f"\n  ... ({hidden} more lines)"
+    # One plain Text renders in a single call, and link brackets can't be misread as markup
+    console.print(Text(preview, style="dim"))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,173 @@
+import os
+import unittest
+
+import httpx
+
+import app
+
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+URLSET = (
+    f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS}>'
+    '<url><loc>https://ex.com/a</loc></url>'
+    '<url><loc> https://ex.com/b </loc></url>'
+    '<url><loc>https://ex.com/a</loc></url>'
+    '</urlset>'
+).encode()
+SITEMAP_INDEX = (
+    f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex {NS}>'
+    '<sitemap><loc>https://ex.com/sm-1.xml</loc></sitemap>'
+    '<sitemap><loc>https://ex.com/sm-2.xml</loc></sitemap>'
+    '</sitemapindex>'
+).encode()
+
+
+def _client(body) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body)))
+
+
+class FetchSitemapTest(unittest.IsolatedAsyncioTestCase):
+    async def _fetch(self, body, max_urls: int = 20, **attrs):
+        crawler = app.AsyncWebCrawler('https://ex.com', max_urls=max_urls)
+        for name, value in attrs.items():
+            setattr(crawler, name, value)
+        found: dict[str, None] = {}
+        async with _client(body) as client:
+            nested = await crawler._fetch_sitemap(client, 'https://ex.com/sitemap.xml', found)
+        return list(found), nested, crawler
+
+    async def test_urlset(self):
+        urls, nested, _ = await self._fetch(URLSET)
+        self.assertEqual(urls, ['https://ex.com/a', 'https://ex.com/b'])
+        self.assertEqual(nested, [])
+
+    async def test_urlset_stops_at_max_urls(self):
+        urls, _, _ = await self._fetch(URLSET, max_urls=1)
+        self.assertEqual(urls, ['https://ex.com/a'])
+
+    async def test_sitemap_index(self):
+        urls, nested, _ = await self._fetch(SITEMAP_INDEX)
+        self.assertEqual(urls, [])
+        self.assertEqual(nested, ['https://ex.com/sm-1.xml', 'https://ex.com/sm-2.xml'])
+
+    async def test_bare_loc_is_ignored(self):
+        urls, nested, _ = await self._fetch(b'<loc>https://ex.com/a</loc>')
+        self.assertEqual((urls, nested), ([], []))
+
+    async def test_truncated_at_max_sitemap_bytes(self):
+        head = URLSET[:URLSET.index(b'<url><loc>https://ex.com/a</loc></url>', 100)]
+        tail = b'<url><loc>https://ex.com/c</loc></url>' * 1000 + b'</urlset>'
+
+        async def chunks():
+            yield head
+            yield tail
+
+        urls, _, crawler = await self._fetch(chunks(), MAX_SITEMAP_BYTES=len(head) + 10)
+        # Entries from the chunk inside the cap are kept; the rest is never parsed
+        self.assertEqual(urls, ['https://ex.com/a', 'https://ex.com/b'])
+        self.assertTrue(any('too large' in line for line in crawler.logs))
+
+
+class ExtractLinksTest(unittest.TestCase):
+    def test_case_and_dot_segment_variants_dedupe(self):
+        html = ''.join(f'<a href="{href}">x</a>' for href in [
+            'https://EX.com/a',
+            'HTTPS://ex.com/a#top',
+            'https://ex.com/x/../a',
+            '/a',
+            'a',
+            'https://other.com/a',
+        ])
+        tree = app.LexborHTMLParser(html)
+        links = app._extract_links(tree, 'https://ex.com/docs/', app._clean_netloc('https://ex.com'))
+        self.assertEqual(links, ['https://ex.com/a', 'https://ex.com/docs/a'])
+
+
+class PageCharsetTest(unittest.IsolatedAsyncioTestCase):
+    async def test_header_charset_without_meta(self):
+        body = '<html><head><title>Café ünïcode</title></head><body></body></html>'.encode('iso-8859-1')
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == '/':
+                return httpx.Response(200, content=body, headers={'Content-Type': 'text/html; charset=iso-8859-1'})
+            return httpx.Response(404)
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            crawler = app.AsyncWebCrawler('https://ex.com', max_urls=5, client=client)
+            pages, _ = await crawler.discover_and_crawl()
+
+        self.assertEqual([page.title for page in pages], ['Café ünïcode'])
+
+
+class PageInfoTest(unittest.TestCase):
+    def test_preview_is_first_long_paragraph(self):
+        long_text = 'x' * 150
+        html = f'<html><body><p>short</p><div><main>{long_text}</main></div><p>{"y" * 150}</p></body></html>'
+        page = app._extract_page_info_static('https://ex.com/', html.encode(), 'ex.com')
+        self.assertEqual(page.content_preview, long_text)
+
+    def test_title_and_meta_outside_head(self):
+        # An unclosed element before <title> ends <head> early, pushing the rest into <body>
+        html = (
+            '<html><head><div></div><title>Late title</title>'
+            '<meta name="description" content="Late description"></head><body></body></html>'
+        )
+        page = app._extract_page_info_static('https://ex.com/', html.encode(), 'ex.com')
+        self.assertEqual((page.title, page.description), ('Late title', 'Late description'))
+
+
+class SharedClientCookieTest(unittest.IsolatedAsyncioTestCase):
+    async def test_cookies_are_not_kept_between_crawls(self):
+        seen_cookies = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen_cookies.append(request.headers.get('Cookie'))
+            return httpx.Response(200, text='ok', headers={'Set-Cookie': 'session=alice; Path=/'})
+
+        client = app._create_http_client()
+        client._transport = httpx.MockTransport(handler)
+        async with client:
+            await client.get('https://ex.com/')
+            await client.get('https://ex.com/')
+
+        self.assertEqual(seen_cookies, [None, None])
+        self.assertEqual(len(client.cookies), 0)
+
+
+class ParsePoolTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        app._parse_pool = app._new_parse_pool()
+
+    async def asyncTearDown(self):
+        await app.stop_parse_pool()
+
+    async def test_small_pages_skip_the_pool(self):
+        # A shut-down pool raises on submit, so this only passes if the page is parsed inline
+        closed = app._new_parse_pool()
+        closed.shutdown()
+        crawler = app.AsyncWebCrawler('https://ex.com', executor=closed)
+        page = await crawler._parse_page('https://ex.com/', b'<title>Home</title>')
+        self.assertEqual(page.title, 'Home')
+
+    async def test_broken_pool_falls_back_inline_and_is_replaced(self):
+        broken = app._parse_pool
+        # Kill a worker the way an OOM kill would
+        with self.assertRaises(app.BrokenProcessPool):
+            broken.submit(os._exit, 1).result()
+
+        crawler = app.AsyncWebCrawler('https://ex.com', executor=broken)
+        crawler.POOL_PARSE_MIN_BYTES = 0
+        page = await crawler._parse_page('https://ex.com/', b'<title>Home</title>')
+
+        self.assertEqual(page.title, 'Home')
+        self.assertIsNone(crawler.executor)
+        self.assertIsNot(app._parse_pool, broken)
+        # The replacement pool works for the next request
+        crawler = app.AsyncWebCrawler('https://ex.com', executor=app._parse_pool)
+        crawler.POOL_PARSE_MIN_BYTES = 0
+        page = await crawler._parse_page('https://ex.com/', b'<title>Again</title>')
+        self.assertEqual(page.title, 'Again')
+
+
+if __name__ == '__main__':
+    unittest.main()
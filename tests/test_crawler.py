@@ -0,0 +1,140 @@
+import asyncio
+import gc
+import tempfile
+import unittest
+from unittest import mock
+
+import httpx
+
+from crawler import WebCrawler
+
+
+ROBOTS = "User-agent: *\nDisallow: /tag/\nSitemap: https://ex.com/sitemap.xml\n"
+SITEMAP = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+    '<url><loc>https://ex.com/tag/1</loc></url>'
+    '<url><loc>https://ex.com/tag/2</loc></url>'
+    '<url><loc>https://ex.com/a</loc></url>'
+    '<url><loc>https://ex.com/b</loc></url>'
+    '</urlset>'
+)
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path == '/robots.txt':
+        return httpx.Response(200, text=ROBOTS)
+    if request.url.path == '/sitemap.xml':
+        return httpx.Response(200, text=SITEMAP, headers={'Content-Type': 'application/xml'})
+    return httpx.Response(200, text='<html><head><title>Page</title></head><body></body></html>')
+
+
+class DiscoveryRobotsTest(unittest.IsolatedAsyncioTestCase):
+    async def test_disallowed_urls_do_not_use_the_url_budget(self):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(_handler)) as client:
+            crawler = WebCrawler('https://ex.com', max_urls=2, client=client)
+            urls = await crawler.discover_urls_async()
+
+        self.assertEqual(urls, ['https://ex.com/a', 'https://ex.com/b'])
+
+
+class SitemapWalkTest(unittest.IsolatedAsyncioTestCase):
+    async def test_early_stop_waits_for_pending_sitemaps(self):
+        index = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            '<sitemap><loc>https://ex.com/sitemap-1.xml</loc></sitemap>'
+            '<sitemap><loc>https://ex.com/sitemap-2.xml</loc></sitemap>'
+            '</sitemapindex>'
+        )
+        stopped = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == '/robots.txt':
+                return httpx.Response(200, text=ROBOTS)
+            if request.url.path == '/sitemap.xml':
+                return httpx.Response(200, text=index)
+            if request.url.path == '/sitemap-1.xml':
+                return httpx.Response(200, text=SITEMAP)
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                stopped.append(request.url.path)
+                # A failure while being cancelled becomes the task's exception
+                raise RuntimeError('cleanup failed')
+
+        errors = []
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            crawler = WebCrawler('https://ex.com', max_urls=1, client=client)
+            urls = await crawler.discover_urls_async()
+            self.assertEqual(stopped, ['/sitemap-2.xml'])
+        await asyncio.sleep(0)
+        gc.collect()
+
+        self.assertEqual(urls, ['https://ex.com/a'])
+        self.assertEqual(errors, [])
+
+    async def test_duplicate_sitemaps_share_one_download(self):
+        index = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            '<sitemap><loc>https://ex.com/pages.xml</loc></sitemap>'
+            '<sitemap><loc>https://ex.com/pages.xml</loc></sitemap>'
+            '</sitemapindex>'
+        )
+        requested = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            requested.append(request.url.path)
+            if request.url.path == '/robots.txt':
+                return httpx.Response(200, text=ROBOTS)
+            if request.url.path == '/sitemap.xml':
+                return httpx.Response(200, text=index)
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, text=SITEMAP)
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            crawler = WebCrawler('https://ex.com', max_urls=5, client=client)
+            urls = await crawler.discover_urls_async()
+
+        self.assertEqual(urls, ['https://ex.com/a', 'https://ex.com/b'])
+        self.assertEqual(requested.count('/pages.xml'), 1)
+
+class HttpCacheTest(unittest.IsolatedAsyncioTestCase):
+    async def test_second_run_revalidates_and_reuses_the_body(self):
+        conditional = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path != '/':
+                return httpx.Response(404)
+            conditional.append((request.headers.get('If-None-Match'), request.headers.get('If-Modified-Since')))
+            if request.headers.get('If-None-Match') == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, text='<html><head><title>Home</title></head><body></body></html>',
+                                  headers={'ETag': '"v1"', 'Last-Modified': 'Wed, 01 Jan 2025 00:00:00 GMT'})
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            titles = []
+            for _ in range(2):
+                async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                    crawler = WebCrawler('https://ex.com', client=client, cache_dir=cache_dir)
+                    try:
+                        page = await crawler.crawl_one('https://ex.com/')
+                    finally:
+                        await crawler.close()
+                titles.append(page.title)
+
+        self.assertEqual(conditional, [(None, None), ('"v1"', 'Wed, 01 Jan 2025 00:00:00 GMT')])
+        self.assertEqual(titles, ['Home', 'Home'])
+
+    async def test_bad_cache_dir_does_not_create_a_client(self):
+        with tempfile.NamedTemporaryFile() as not_a_dir, \
+                mock.patch.object(WebCrawler, '_create_client') as create_client:
+            with self.assertRaises(OSError):
+                WebCrawler('https://ex.com', cache_dir=not_a_dir.name)
+        create_client.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
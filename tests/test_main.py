@@ -0,0 +1,34 @@
+import asyncio
+import unittest
+
+import main
+
+
+class FailingCrawler:
+    concurrency = 2
+
+    def __init__(self):
+        self.discovery_stopped = False
+
+    async def iter_discovered_urls(self):
+        try:
+            for i in range(100):
+                yield f'https://ex.com/{i}'
+                await asyncio.sleep(0.01)
+        finally:
+            self.discovery_stopped = True
+
+    async def crawl_one(self, url):
+        raise RuntimeError(f'failed {url}')
+
+
+class DiscoverAndCrawlTest(unittest.IsolatedAsyncioTestCase):
+    async def test_worker_failure_stops_discovery(self):
+        crawler = FailingCrawler()
+        with self.assertRaises(RuntimeError):
+            await main._discover_and_crawl(crawler)
+        self.assertTrue(crawler.discovery_stopped)
+
+
+if __name__ == '__main__':
+    unittest.main()